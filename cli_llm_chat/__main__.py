@@ -0,0 +1,7 @@
+"""
+Allow running CLI LLM Chat with `python -m cli_llm_chat`
+"""
+
+from cli_llm_chat.main import main
+
+main()
@@ -0,0 +1,224 @@
+"""
+Response cache for OpenRouter chat completions
+Stores responses for deterministic requests so identical calls skip the network.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from cli_llm_chat.config.settings import get_config_dir, dumps_json, loads_json, atomic_write_bytes
+
+
+class InMemoryLRU:
+    """In-process least-recently-used cache backend"""
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize the in-memory backend
+
+        Args:
+            max_entries: Maximum number of entries kept before evicting the oldest
+        """
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class FileBackend:
+    """Cache backend persisted to a JSON file in the config directory"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize the file backend
+
+        Args:
+            path: Cache file path (defaults to llm_cache.json in the config directory)
+        """
+        self.path = path or get_config_dir() / "llm_cache.json"
+        self._data = None
+
+    def _load(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = {}
+            if self.path.exists():
+                try:
+                    self._data = loads_json(self.path.read_bytes())
+                except Exception as e:
+                    print(f"Error loading response cache: {e}")
+        return self._data
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._load().get(key)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        data = self._load()
+        data[key] = value
+        try:
+            atomic_write_bytes(self.path, dumps_json(data, indent=False))
+        except Exception as e:
+            print(f"Error saving response cache: {e}")
+
+    def clear(self) -> None:
+        self._data = {}
+        if self.path.exists():
+            self.path.unlink()
+
+
+class DiskCacheBackend:
+    """
+    Cache backend stored in a size-limited diskcache directory
+
+    Requires the optional `diskcache` package. Each store writes a single
+    entry instead of rewriting the whole cache like FileBackend, and the
+    least recently used entries are evicted once the size limit is reached.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_gb: float = 1.0):
+        """
+        Initialize the diskcache backend
+
+        Args:
+            path: Cache directory (defaults to cache/ in the config directory)
+            max_gb: Maximum size of the cache on disk, in gigabytes
+
+        Raises:
+            ImportError: If diskcache is not installed
+        """
+        import diskcache
+
+        self.path = path or get_config_dir() / "cache"
+        self._cache = diskcache.Cache(
+            str(self.path),
+            size_limit=int(max_gb * 1024 ** 3),
+            eviction_policy="least-recently-used"
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        try:
+            self._cache.set(key, value)
+        except Exception as e:
+            print(f"Error saving response cache: {e}")
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class LLMCache:
+    """Exact-match cache for deterministic (temperature 0) chat completions"""
+
+    def __init__(self, backend=None, enabled: bool = True):
+        """
+        Initialize the cache
+
+        Args:
+            backend: Storage backend with get/set/clear methods (defaults to InMemoryLRU)
+            enabled: Whether lookups and stores are performed at all
+        """
+        self.backend = backend if backend is not None else InMemoryLRU()
+        self.enabled = enabled
+        self.stats = {"hits": 0, "misses": 0}
+
+    def cache_key(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> Optional[str]:
+        """
+        Build the cache key for a request
+
+        Args:
+            model: Model identifier
+            messages: List of message objects with role and content
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Hex digest key, or None if the cache is disabled or the request is not deterministic
+        """
+        if not self.enabled or temperature > 0:
+            return None
+
+        raw = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Cache key from cache_key()
+
+        Returns:
+            Cached API response, or None on a miss
+        """
+        if key is None:
+            return None
+
+        value = self.backend.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return value
+
+    def set(self, key: Optional[str], value: Dict[str, Any]) -> None:
+        """
+        Store a response in the cache
+
+        Args:
+            key: Cache key from cache_key()
+            value: API response to store
+        """
+        if key is None:
+            return
+        self.backend.set(key, value)
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        self.backend.clear()
+
+
+def create_cache(max_gb: float = 1.0) -> LLMCache:
+    """
+    Create the persistent response cache used by the CLI commands
+
+    Args:
+        max_gb: Maximum size of the cache on disk, in gigabytes
+
+    Returns:
+        LLMCache backed by diskcache, or by an in-memory LRU if diskcache is not installed
+    """
+    try:
+        return LLMCache(DiskCacheBackend(max_gb=max_gb))
+    except ImportError:
+        return LLMCache()
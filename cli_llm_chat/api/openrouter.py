@@ -3,128 +3,735 @@ OpenRouter API Client
 Handles communication with the OpenRouter API for LLM access.
 """
 
-import requests
+import atexit
+import functools
+import hashlib
 import json
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Iterator
+
+from cli_llm_chat.api.cache import LLMCache
+from cli_llm_chat.config.settings import get_config_dir, dumps_json, loads_json, atomic_write_bytes
+
+if TYPE_CHECKING:
+    # Only needed for annotations; the module is imported by callers that enable it
+    from cli_llm_chat.api.semantic_cache import SemanticCache
+
+
+# Placeholder values from the docs and .env.example that are never real keys
+_INVALID_KEYS = frozenset({"", "your_api_key_here", "sk-or-v1-your-api-key-here"})
+
+
+def _apply_prompt_cache_hints(messages: List[Dict[str, Any]], model: str) -> List[Dict[str, Any]]:
+    """
+    Mark stable prefix segments so the provider can cache them server-side
+    
+    Anthropic models need explicit `cache_control` breakpoints, which are set
+    on the last system message and the last assistant message. OpenAI and
+    Gemini models cache long identical prefixes automatically, so their
+    messages are returned unchanged (the system message already leads).
+    
+    Args:
+        messages: List of message objects with role and content
+        model: Model identifier
+        
+    Returns:
+        Messages to send, without modifying the input list
+    """
+    if not model.startswith("anthropic/"):
+        return messages
+    
+    marked = list(messages)
+    for role in ("system", "assistant"):
+        for i in range(len(marked) - 1, -1, -1):
+            message = marked[i]
+            if message.get("role") != role:
+                continue
+            content = message.get("content")
+            if isinstance(content, str) and content:
+                marked[i] = {
+                    **message,
+                    "content": [
+                        {"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}
+                    ]
+                }
+            break
+    
+    return marked
+
+
+def extract_content(response: Dict[str, Any]) -> str:
+    """
+    Get the assistant message text from a chat completion response
+    
+    Args:
+        response: Chat completion response from the API or cache
+        
+    Returns:
+        Message content, or an empty string if the response has none
+    """
+    try:
+        return response["choices"][0]["message"]["content"] or ""
+    except (KeyError, IndexError, TypeError):
+        return ""
+
+def _load_models_cache() -> Optional[Dict[str, Any]]:
+    """
+    Read the model catalog disk cache, however old it is
+    
+    Returns:
+        Dictionary with fetched_at and data keys, or None if missing or unreadable
+    """
+    cache_file = get_config_dir() / "models_cache.json"
+    try:
+        return loads_json(cache_file.read_bytes())
+    except Exception:
+        return None
+
+
+def cached_model_ids() -> List[str]:
+    """
+    Get the model ids from the disk cache without touching the network
+    
+    Used for shell completion, so stale entries are returned rather than
+    nothing; an API key is not required.
+    
+    Returns:
+        List of model ids, empty if the catalog has never been fetched
+    """
+    cached = _load_models_cache()
+    if cached is None:
+        return []
+    return [m.get("id", "") for m in cached.get("data") or [] if m.get("id")]
+
+
+USER_AGENT = "cli_llm_chat/0.1.0"
+
+_session = None
+
+
+def _get_session():
+    """
+    Get the process-wide requests session, creating it on first use
+    
+    Every client and command shares this session, so one pool of keep-alive
+    connections to openrouter.ai serves the whole CLI lifetime.
+    
+    Returns:
+        requests.Session instance
+    """
+    global _session
+    if _session is None:
+        # requests is imported here rather than at module level so CLI commands
+        # that never talk to the API don't pay for importing it
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        _session = requests.Session()
+        _session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False
+            )
+        )
+        _session.mount("https://", adapter)
+        atexit.register(_session.close)
+    return _session
 
 
 class OpenRouterClient:
     """Client for interacting with the OpenRouter API"""
     
     BASE_URL = "https://openrouter.ai/api/v1"
+    # (connect, read) timeouts in seconds
+    TIMEOUT = (5, 60)
+    # How long the model catalog is served from the disk cache, in seconds
+    MODELS_CACHE_TTL = 3600
+    # Maximum number of bytes of an unparseable error body to show
+    ERROR_BODY_LIMIT = 2048
     
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        cache: Optional[LLMCache] = None,
+        semantic_cache: Optional["SemanticCache"] = None
+    ):
         """
         Initialize the OpenRouter client
         
         Args:
             api_key: OpenRouter API key
+            cache: Response cache for deterministic requests (defaults to an in-memory LLMCache)
+            semantic_cache: Optional cache matching rephrased prompts by embedding similarity
         """
-        if not api_key or api_key == "your_api_key_here" or api_key == "sk-or-v1-your-api-key-here":
+        if api_key is None or api_key in _INVALID_KEYS:
             raise ValueError("Invalid API key. Please set a valid OpenRouter API key.")
             
         self.api_key = api_key
         self.default_model = None
+        self._payload_template = {"model": None, "temperature": 0.7, "max_tokens": 1000}
+        self.cache = cache if cache is not None else LLMCache()
+        self.semantic_cache = semantic_cache
+        self._chat_url = f"{self.BASE_URL}/chat/completions"
+        self._models_url = f"{self.BASE_URL}/models"
         self.headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}",  
             "HTTP-Referer": "https://github.com/cli-llm-chat",  
             "X-Title": "CLI LLM Chat"  
         }
+        
+        # Process-wide session shared by every client; auth headers are sent per request
+        self.session = _get_session()
+        
+        # Async client for concurrent completions, created lazily on first use
+        self.aclient = None
+        self._aclient_loop = None
+        
+        # In-process copy of the model catalog
+        self._models = None
     
-    def chat_completion(
-        self, 
-        model: str, 
-        messages: List[Dict[str, str]],
+    def close(self) -> None:
+        """
+        Close the pooled HTTP connections
+        
+        The shared session stays usable and reconnects on the next request.
+        """
+        self.session.close()
+    
+    def __enter__(self) -> "OpenRouterClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _require_key(self) -> None:
+        """Fail fast, before any payload or network work, if no API key is set"""
+        if not self.api_key:
+            raise ValueError("API key not set. Please set your API key using the config-set command.")
+    
+    def set_defaults(
+        self,
+        model: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 1000,
-        debug: bool = False
+        max_tokens: int = 1000
+    ) -> None:
+        """
+        Set the request parameters used when a call doesn't pass its own
+        
+        An interactive session sends many completions with the same model and
+        parameters, so they are kept in a payload template and each call only
+        adds its messages.
+        
+        Args:
+            model: Default model identifier
+            temperature: Default sampling temperature
+            max_tokens: Default maximum tokens to generate
+        """
+        self.default_model = model
+        self._payload_template = {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+    
+    def _prepare_request(
+        self,
+        model: Optional[str],
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        debug: bool
     ) -> Dict[str, Any]:
         """
-        Send a chat completion request to OpenRouter
+        Validate chat completion arguments and build the request payload
         
         Args:
-            model: Model identifier (e.g., "openai/gpt-3.5-turbo")
+            model: Model identifier, or None for the default
             messages: List of message objects with role and content
-            temperature: Sampling temperature (0.0 to 1.0)
-            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature, or None for the default
+            max_tokens: Maximum tokens to generate, or None for the default
             debug: Whether to print debug information
             
         Returns:
-            API response as a dictionary
+            Request payload as a dictionary
         """
-        if not self.api_key:
-            raise ValueError("API key not set. Please set your API key using the config-set command.")
+        # Start from the per-session template and override only what the caller passed
+        payload = self._payload_template.copy()
+        if model is not None:
+            payload["model"] = model
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
             
-        if not model:
+        if not payload["model"]:
             raise ValueError("Model ID not specified. Please provide a valid model ID.")
             
         if not messages or len(messages) == 0:
             raise ValueError("No messages provided. Please provide at least one message.")
         
-        url = f"{self.BASE_URL}/chat/completions"
-        
-        payload = {
-            "model": model,
-            "messages": messages,
-            "temperature": temperature,
-            "max_tokens": max_tokens
-        }
+        payload["messages"] = _apply_prompt_cache_hints(messages, payload["model"])
         
         # Debug information
         if debug:
-            print(f"\nRequest URL: {url}")
+            print(f"\nRequest URL: {self._chat_url}")
             print(f"Headers: Authorization: Bearer ****{self.api_key[-4:] if len(self.api_key) >= 4 else '****'}")
             print(f"Payload: {json.dumps(payload, indent=2)}")
         
-        try:
-            response = requests.post(url, headers=self.headers, json=payload)
-            
-            # Debug response
+        return payload
+    
+    def _raise_for_error(self, response, debug: bool) -> None:
+        """
+        Raise an exception describing a non-200 API response
+        
+        Works with both requests and httpx responses.
+        
+        Args:
+            response: HTTP response object
+            debug: Whether to print debug information
+        """
+        # Debug response
+        if debug:
+            print(f"Response status: {response.status_code}")
+            print("Response headers: " + ", ".join(f"{k}: {v}" for k, v in response.headers.items()))
+        
+        if response.status_code != 200:
+            error_msg = f"API Error: {response.status_code}"
+            try:
+                error_data = response.json()
+                if debug:
+                    print(f"Error response: {error_data}")
+                if "error" in error_data:
+                    error_msg = f"API Error: {error_data['error']['message']}"
+                elif "message" in error_data:
+                    error_msg = f"API Error: {error_data['message']}"
+            except:
+                # Only decode a bounded prefix, error pages can be large HTML documents
+                body = response.content[:self.ERROR_BODY_LIMIT].decode("utf-8", errors="replace")
+                if debug:
+                    print(f"Could not parse error response: {body}")
+                if body:
+                    error_msg = f"API Error: {body}"
+            raise Exception(error_msg)
+    
+    def _semantic_key(self, payload: Dict[str, Any], messages: List[Dict[str, str]], cache_namespace: str):
+        """
+        Get the semantic cache namespace and prompt text for a request
+        
+        Only the last user message is matched by similarity. Everything before
+        it and the sampling parameters are part of the namespace, so follow-ups
+        like "why?" only match within the same conversation context.
+        
+        Returns:
+            (namespace, text) tuple, or None if the semantic cache does not apply
+        """
+        if self.semantic_cache is None or messages[-1].get("role") != "user":
+            return None
+        context = json.dumps(
+            {
+                "messages": messages[:-1],
+                "temperature": payload["temperature"],
+                "max_tokens": payload["max_tokens"]
+            },
+            sort_keys=True
+        )
+        digest = hashlib.sha256(context.encode("utf-8")).hexdigest()
+        # Scope entries per namespace, model and context so responses never leak across them
+        return f"{cache_namespace}:{payload['model']}:{digest}", messages[-1].get("content", "")
+    
+    def _cache_lookup(
+        self,
+        payload: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        cache_namespace: str,
+        debug: bool
+    ):
+        """
+        Look a request up in the exact and semantic caches
+        
+        Returns:
+            (exact cache key, cached response or None) tuple
+        """
+        model = payload["model"]
+        cache_key = self.cache.cache_key(model, messages, payload["temperature"], payload["max_tokens"])
+        cached = self.cache.get(cache_key)
+        if cached is not None:
             if debug:
-                print(f"Response status: {response.status_code}")
-                print(f"Response headers: {response.headers}")
+                print("Response served from cache")
+            return cache_key, cached
+        
+        semantic_key = self._semantic_key(payload, messages, cache_namespace)
+        if semantic_key is not None:
+            cached = self.semantic_cache.lookup(*semantic_key)
+            if cached is not None and debug:
+                print("Response served from semantic cache")
+        
+        return cache_key, cached
+    
+    def _cache_store(
+        self,
+        cache_key: Optional[str],
+        payload: Dict[str, Any],
+        messages: List[Dict[str, str]],
+        cache_namespace: str,
+        result: Dict[str, Any]
+    ) -> None:
+        """Store a successful response in the exact and semantic caches"""
+        self.cache.set(cache_key, result)
+        
+        semantic_key = self._semantic_key(payload, messages, cache_namespace)
+        if semantic_key is not None:
+            self.semantic_cache.add(*semantic_key, result)
+    
+    def chat_completion(
+        self, 
+        model: Optional[str] = None, 
+        messages: Optional[List[Dict[str, str]]] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        debug: bool = False,
+        cache_namespace: str = "default"
+    ) -> Dict[str, Any]:
+        """
+        Send a chat completion request to OpenRouter
+        
+        Args:
+            model: Model identifier (e.g., "openai/gpt-3.5-turbo"), defaults to set_defaults()
+            messages: List of message objects with role and content
+            temperature: Sampling temperature (0.0 to 1.0), defaults to set_defaults()
+            max_tokens: Maximum tokens to generate, defaults to set_defaults()
+            debug: Whether to print debug information
+            cache_namespace: Semantic cache namespace, e.g. the conversation name
             
-            if response.status_code != 200:
-                error_msg = f"API Error: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    if debug:
-                        print(f"Error response: {error_data}")
-                    if "error" in error_data:
-                        error_msg = f"API Error: {error_data['error']['message']}"
-                    elif "message" in error_data:
-                        error_msg = f"API Error: {error_data['message']}"
-                except:
-                    if debug:
-                        print(f"Could not parse error response: {response.text}")
-                    if response.text:
-                        error_msg = f"API Error: {response.text}"
-                raise Exception(error_msg)
+        Returns:
+            API response as a dictionary
+        """
+        self._require_key()
+        import requests
+        
+        payload = self._prepare_request(model, messages, temperature, max_tokens, debug)
+        
+        cache_key, cached = self._cache_lookup(payload, messages, cache_namespace, debug)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = self.session.post(self._chat_url, headers=self.headers, json=payload, timeout=self.TIMEOUT)
+            self._raise_for_error(response, debug)
+            result = loads_json(response.content)
+            self._cache_store(cache_key, payload, messages, cache_namespace, result)
+            return result
+        except requests.exceptions.RequestException as e:
+            if debug:
+                print(f"Request error: {str(e)}")
+            raise Exception(f"Network error: {str(e)}")
+    
+    def chat_completion_stream(
+        self,
+        model: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        debug: bool = False,
+        cache_namespace: str = "default",
+        stop: Optional[threading.Event] = None
+    ) -> Iterator[str]:
+        """
+        Stream a chat completion from OpenRouter as Server-Sent Events
+        
+        Content deltas are yielded as they arrive. The full response is
+        accumulated so the caches are still populated once the stream ends.
+        
+        Args:
+            model: Model identifier (e.g., "openai/gpt-3.5-turbo"), defaults to set_defaults()
+            messages: List of message objects with role and content
+            temperature: Sampling temperature (0.0 to 1.0), defaults to set_defaults()
+            max_tokens: Maximum tokens to generate, defaults to set_defaults()
+            debug: Whether to print debug information
+            cache_namespace: Semantic cache namespace, e.g. the conversation name
+            stop: Event that ends the stream early when set; the connection is
+                  closed and the partial response is not cached
             
-            return response.json()
+        Yields:
+            Content deltas of the assistant message
+        """
+        self._require_key()
+        import requests
+        
+        payload = self._prepare_request(model, messages, temperature, max_tokens, debug)
+        
+        cache_key, cached = self._cache_lookup(payload, messages, cache_namespace, debug)
+        if cached is not None:
+            yield extract_content(cached)
+            return
+        
+        parts = []
+        try:
+            with self.session.post(
+                self._chat_url,
+                headers=self.headers,
+                json={**payload, "stream": True},
+                stream=True,
+                timeout=self.TIMEOUT
+            ) as response:
+                self._raise_for_error(response, debug)
+                
+                # Lines stay as bytes: event streams are UTF-8 but carry no charset,
+                # so requests would decode them as ISO-8859-1
+                for line in response.iter_lines():
+                    if stop is not None and stop.is_set():
+                        return
+                    
+                    # Skip keep-alive comments and blank separators between events
+                    if not line or not line.startswith(b"data: "):
+                        continue
+                    data = line[len(b"data: "):]
+                    if data == b"[DONE]":
+                        break
+                    
+                    chunk = loads_json(data)
+                    if "error" in chunk:
+                        raise Exception(f"API Error: {chunk['error'].get('message', chunk['error'])}")
+                    
+                    choices = chunk.get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content") or ""
+                    if delta:
+                        parts.append(delta)
+                        yield delta
         except requests.exceptions.RequestException as e:
             if debug:
                 print(f"Request error: {str(e)}")
             raise Exception(f"Network error: {str(e)}")
+        
+        result = {"choices": [{"message": {"role": "assistant", "content": "".join(parts)}}]}
+        self._cache_store(cache_key, payload, messages, cache_namespace, result)
     
-    def list_models(self):
+    def _get_async_client(self):
+        """
+        Get the shared httpx.AsyncClient, creating it on first use
+        
+        The pool is bound to the running event loop, so a new client is
+        created if the loop has changed (e.g. across asyncio.run calls).
+        
+        Returns:
+            httpx.AsyncClient instance
+        """
+        import asyncio
+        import httpx
+        
+        loop = asyncio.get_running_loop()
+        if self.aclient is None or self._aclient_loop is not loop:
+            self.aclient = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                http2=True,
+                headers={**self.headers, "User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=128, max_keepalive_connections=64),
+                timeout=httpx.Timeout(60.0, connect=5.0)
+            )
+            self._aclient_loop = loop
+        return self.aclient
+    
+    async def chat_completion_async(
+        self,
+        model: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        debug: bool = False,
+        cache_namespace: str = "default"
+    ) -> Dict[str, Any]:
+        """
+        Send a chat completion request to OpenRouter without blocking
+        
+        Independent completions can be overlapped, e.g. to try the same
+        query across several models:
+        
+            await asyncio.gather(*[client.chat_completion_async(m, msgs) for m in models])
+        
+        Args:
+            model: Model identifier (e.g., "openai/gpt-3.5-turbo"), defaults to set_defaults()
+            messages: List of message objects with role and content
+            temperature: Sampling temperature (0.0 to 1.0), defaults to set_defaults()
+            max_tokens: Maximum tokens to generate, defaults to set_defaults()
+            debug: Whether to print debug information
+            cache_namespace: Semantic cache namespace, e.g. the conversation name
+            
+        Returns:
+            API response as a dictionary
+        """
+        self._require_key()
+        import httpx
+        
+        payload = self._prepare_request(model, messages, temperature, max_tokens, debug)
+        
+        cache_key, cached = self._cache_lookup(payload, messages, cache_namespace, debug)
+        if cached is not None:
+            return cached
+        
+        aclient = self._get_async_client()
+        
+        try:
+            response = await aclient.post("/chat/completions", json=payload)
+            self._raise_for_error(response, debug)
+            result = loads_json(response.content)
+            self._cache_store(cache_key, payload, messages, cache_namespace, result)
+            return result
+        except httpx.HTTPError as e:
+            if debug:
+                print(f"Request error: {str(e)}")
+            raise Exception(f"Network error: {str(e)}")
+    
+    async def chat_completion_many(
+        self,
+        batch: List[Dict[str, Any]],
+        debug: bool = False,
+        cache_namespace: str = "batch"
+    ) -> List[Any]:
+        """
+        Send independent chat completion requests concurrently
+        
+        Requests share the HTTP/2 connection pool, so many of them are
+        multiplexed over a few connections instead of running one by one.
+        
+        Args:
+            batch: Keyword arguments for chat_completion_async() per request
+                   (messages, and optionally model, temperature, max_tokens)
+            debug: Whether to print debug information
+            cache_namespace: Semantic cache namespace for the batch
+            
+        Returns:
+            API responses in input order; a failed request yields its exception instead
+        """
+        import asyncio
+        
+        return await asyncio.gather(
+            *[
+                self.chat_completion_async(debug=debug, cache_namespace=cache_namespace, **request)
+                for request in batch
+            ],
+            return_exceptions=True
+        )
+    
+    async def aclose(self) -> None:
+        """Close the async HTTP client if one was created"""
+        if self.aclient is not None:
+            await self.aclient.aclose()
+            self.aclient = None
+            self._aclient_loop = None
+    
+    def _read_models_cache(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Read the model catalog from the disk cache if it is still fresh
+        
+        Returns:
+            Cached list of models, or None if missing or expired
+        """
+        cached = _load_models_cache()
+        if cached is None:
+            return None
+        
+        if time.time() - cached.get("fetched_at", 0) >= self.MODELS_CACHE_TTL:
+            return None
+        return cached.get("data")
+    
+    def _write_models_cache(self, models: List[Dict[str, Any]]) -> None:
+        """
+        Write the model catalog to the disk cache
+        
+        Args:
+            models: List of models returned by the API
+        """
+        cache_file = get_config_dir() / "models_cache.json"
+        try:
+            # Written atomically, so shell completion never reads a partial file
+            atomic_write_bytes(cache_file, dumps_json({"fetched_at": time.time(), "data": models}, indent=False))
+        except Exception as e:
+            print(f"Error saving models cache: {e}")
+    
+    def list_models(self, refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Get a list of available models from the OpenRouter API
+        
+        The catalog changes rarely, so it is memoized in-process and cached
+        on disk for MODELS_CACHE_TTL seconds.
+        
+        Args:
+            refresh: Skip the caches and always fetch from the API
+            
+        Returns:
+            List of model objects
         """
-        if not self.api_key:
-            raise ValueError("API key not set. Please set your API key using the config-set command.")
+        self._require_key()
         
-        url = "https://openrouter.ai/api/v1/models"
+        if not refresh:
+            if self._models is None:
+                self._models = self._read_models_cache()
+            if self._models is not None:
+                return list(self._models)
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+        response = self.session.get(self._models_url, headers=self.headers, timeout=self.TIMEOUT)
+        
+        if response.status_code != 200:
+            body = response.content[:self.ERROR_BODY_LIMIT].decode("utf-8", errors="replace")
+            raise Exception(f"Failed to fetch models. Status code: {response.status_code}. Response: {body}")
+        
+        self._models = loads_json(response.content).get('data', [])
+        self._write_models_cache(self._models)
+        return list(self._models)
+    
+    async def list_models_async(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get a list of available models without blocking
         
-        response = requests.get(url, headers=headers)
+        Shares the in-process and disk caches with list_models(), so it can
+        run concurrently with other diagnostics or completions.
+        
+        Args:
+            refresh: Skip the caches and always fetch from the API
+            
+        Returns:
+            List of model objects
+        """
+        self._require_key()
+        
+        if not refresh:
+            if self._models is None:
+                self._models = self._read_models_cache()
+            if self._models is not None:
+                return list(self._models)
+        
+        aclient = self._get_async_client()
+        response = await aclient.get("/models")
         
         if response.status_code != 200:
-            raise Exception(f"Failed to fetch models. Status code: {response.status_code}. Response: {response.text}")
+            body = response.content[:self.ERROR_BODY_LIMIT].decode("utf-8", errors="replace")
+            raise Exception(f"Failed to fetch models. Status code: {response.status_code}. Response: {body}")
+        
+        self._models = loads_json(response.content).get('data', [])
+        self._write_models_cache(self._models)
+        return list(self._models)
+
+
+@functools.lru_cache(maxsize=4)
+def get_client(api_key: str) -> OpenRouterClient:
+    """
+    Get the shared OpenRouter client for an API key
+    
+    All call sites in the process share one client, and with it one
+    connection pool and one set of caches.
+    
+    Args:
+        api_key: OpenRouter API key
         
-        return response.json().get('data', [])
+    Returns:
+        OpenRouterClient instance
+    """
+    return OpenRouterClient(api_key)
@@ -0,0 +1,159 @@
+"""
+Semantic response cache for OpenRouter chat completions
+Matches rephrased prompts by embedding similarity so near-duplicates skip the network.
+"""
+
+import io
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from cli_llm_chat.config.settings import get_config_dir, dumps_json, loads_json, atomic_write_bytes
+
+
+class SemanticCache:
+    """
+    Cache keyed by sentence embeddings of the last user message
+
+    Requires the optional `sentence-transformers` and `numpy` packages,
+    which are only imported when the cache is first used.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        threshold: float = 0.92,
+        model_name: str = "all-MiniLM-L6-v2",
+        max_entries: int = 1000
+    ):
+        """
+        Initialize the semantic cache
+
+        Args:
+            path: Cache file path (defaults to semantic_cache.npz in the config directory)
+            threshold: Minimum cosine similarity for a hit
+            model_name: sentence-transformers model used for embeddings
+            max_entries: Maximum number of entries kept before evicting the oldest
+        """
+        self.path = path or get_config_dir() / "semantic_cache.npz"
+        self.threshold = threshold
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._model = None
+        self._last_encoded = (None, None)
+        self._emb_matrix = None
+        self._namespaces = []
+        self._responses = []
+
+    def _encode(self, text: str):
+        """
+        Embed text as a unit-length float32 vector
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            numpy array of shape (dim,)
+        """
+        # A miss is followed by add() for the same prompt, so reuse the last embedding
+        if self._last_encoded[0] == text:
+            return self._last_encoded[1]
+
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        q = self._model.encode(text, normalize_embeddings=True).astype("float32")
+        self._last_encoded = (text, q)
+        return q
+
+    def _load(self) -> None:
+        """Load persisted embeddings and responses on first use"""
+        if self._emb_matrix is not None:
+            return
+
+        import numpy as np
+
+        self._emb_matrix = np.empty((0, 0), dtype=np.float32)
+        if self.path.exists():
+            try:
+                with np.load(self.path) as data:
+                    self._emb_matrix = data["embeddings"].astype(np.float32)
+                    self._namespaces = data["namespaces"].tolist()
+                    self._responses = [loads_json(r) for r in data["responses"].tolist()]
+            except Exception as e:
+                print(f"Error loading semantic cache: {e}")
+
+    def _save(self) -> None:
+        """Persist embeddings and responses to disk"""
+        import numpy as np
+
+        buf = io.BytesIO()
+        try:
+            np.savez(
+                buf,
+                embeddings=self._emb_matrix,
+                namespaces=np.array(self._namespaces, dtype=str),
+                responses=np.array([dumps_json(r, indent=False).decode("utf-8") for r in self._responses], dtype=str)
+            )
+            # An interrupted write must not corrupt the entries already saved
+            atomic_write_bytes(self.path, buf.getvalue())
+        except Exception as e:
+            print(f"Error saving semantic cache: {e}")
+
+    def lookup(self, namespace: str, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached response for a semantically equivalent prompt
+
+        Args:
+            namespace: Cache namespace (entries never match across namespaces)
+            text: Prompt text to match
+
+        Returns:
+            Cached API response, or None on a miss
+        """
+        import numpy as np
+
+        self._load()
+        if not self._responses:
+            self.stats["misses"] += 1
+            return None
+
+        q = self._encode(text)
+        # Embeddings are unit-length, so the dot product is cosine similarity
+        sims = self._emb_matrix @ q
+        sims[np.array(self._namespaces) != namespace] = -1.0
+        best = int(sims.argmax())
+        if sims[best] >= self.threshold:
+            self.stats["hits"] += 1
+            return self._responses[best]
+
+        self.stats["misses"] += 1
+        return None
+
+    def add(self, namespace: str, text: str, response: Dict[str, Any]) -> None:
+        """
+        Store a response under the embedding of its prompt
+
+        Args:
+            namespace: Cache namespace
+            text: Prompt text
+            response: API response to store
+        """
+        import numpy as np
+
+        self._load()
+        q = self._encode(text)
+        if self._emb_matrix.size == 0:
+            self._emb_matrix = q.reshape(1, -1)
+        else:
+            self._emb_matrix = np.vstack([self._emb_matrix, q])
+        self._namespaces.append(namespace)
+        self._responses.append(response)
+        
+        # Evict the oldest entries, so each save stays bounded in size
+        excess = len(self._responses) - self.max_entries
+        if excess > 0:
+            self._emb_matrix = self._emb_matrix[excess:]
+            del self._namespaces[:excess]
+            del self._responses[:excess]
+        self._save()
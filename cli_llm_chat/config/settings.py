@@ -4,16 +4,142 @@ Handles loading, saving, and managing user configuration.
 """
 
 import os
+import re
 import json
+import functools
 from pathlib import Path
 from typing import Dict, Any
-from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    # Fall back to the stdlib json module
+    orjson = None
 
+try:
+    import zstandard
+except ImportError:
+    # Conversations are stored uncompressed without zstandard
+    zstandard = None
+
+
+# Last loaded configuration, keyed by the config file's stamp (see _file_stamp)
+_cache = {"mtime": None, "config": None}
+_DOTENV_LOADED = False
+
+# Reusable zstd contexts, so there is no per-call setup cost
+if zstandard is not None:
+    _CCTX = zstandard.ZstdCompressor(level=3)
+    _DCTX = zstandard.ZstdDecompressor()
+
+# OpenRouter API key format; anything shorter than _KEY_MIN_LENGTH cannot match
+_KEY_RE = re.compile(r"sk-or-v1-[A-Za-z0-9]{40,}")
+_KEY_MIN_LENGTH = len("sk-or-v1-") + 40
+
+# Suffix for newly written conversations, and all suffixes that are readable
+CONVERSATION_SUFFIX = ".jsonl.zst" if zstandard is not None else ".jsonl"
+_CONVERSATION_SUFFIXES = (".jsonl.zst", ".jsonl", ".json")
+
+# Sizes of conversation files known to end on a complete record, so
+# append_messages() only has to check the tail of files it did not write
+_clean_sizes = {}
+
+
+def dumps_json(obj: Any, indent: bool = True) -> bytes:
+    """
+    Serialize an object to JSON bytes
+    
+    Uses orjson when available, otherwise the stdlib json module.
+    
+    Args:
+        obj: Object to serialize
+        indent: Whether to indent the output (compact single-line output otherwise)
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2) if indent else orjson.dumps(obj)
+    if indent:
+        return json.dumps(obj, indent=2).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def loads_json(data: bytes) -> Any:
+    """
+    Deserialize JSON bytes
+    
+    Args:
+        data: UTF-8 encoded JSON (bytes or str)
+        
+    Returns:
+        Deserialized object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """
+    Write bytes to a file so readers never see a partially written file
+    
+    The data goes to a temporary file next to the target, is flushed to
+    disk, and then renamed over the target in one step.
+    
+    Args:
+        path: Destination file path
+        data: File contents
+    """
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+
+
+def atomic_write_json(path: Path, obj: Any) -> None:
+    """
+    Atomically write an object as indented JSON
+    
+    Args:
+        path: Destination file path
+        obj: Object to serialize
+    """
+    atomic_write_bytes(path, dumps_json(obj))
+
+
+def _load_dotenv_once() -> None:
+    """
+    Load variables from a .env file, at most once per process
+    
+    Only the current directory and the home directory are checked, and
+    dotenv is not imported at all when neither has a .env file.
+    """
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        _DOTENV_LOADED = True
+        for candidate in (Path.cwd() / ".env", Path.home() / ".env"):
+            if candidate.is_file():
+                # Imported lazily to keep it off the CLI startup path
+                from dotenv import load_dotenv
+                load_dotenv(candidate, override=False)
+                break
+
+
+@functools.lru_cache(maxsize=1)
 def get_config_dir() -> Path:
     """
     Get the configuration directory path
     
+    The directory is created on the first call; the result is cached for
+    the lifetime of the process.
+    
     Returns:
         Path to the configuration directory
     """
@@ -31,6 +157,7 @@ def get_config_dir() -> Path:
     return config_dir
 
 
+@functools.lru_cache(maxsize=1)
 def get_config_file() -> Path:
     """
     Get the configuration file path
@@ -45,6 +172,10 @@ DEFAULT_CONFIG = {
     "verbosity": "medium",  # 'short', 'medium', or 'long'
     "api_key": None,
     "default_model": "google/gemini-2.0-flash-001",
+    "semantic_cache_enabled": False,  # requires sentence-transformers and numpy
+    "context_window": 20,  # recent messages sent with each request (0 sends the full history)
+    "max_context_tokens": 0,  # token budget for the messages sent with each request (0 disables it)
+    "cache_max_gb": 1.0,  # size limit of the on-disk response cache (requires diskcache)
 }
 
 
@@ -59,7 +190,7 @@ def get_api_key(config: Dict[str, Any]) -> str:
         API key string or None if not found
     """
     # Load environment variables
-    load_dotenv()
+    _load_dotenv_once()
     
     # Try to get API key from environment variable
     api_key = os.environ.get("OPENROUTER_API_KEY")
@@ -81,27 +212,27 @@ def validate_api_key(api_key: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    if not api_key:
-        return False
-    
-    # Basic validation: Check if it's a non-empty string with reasonable length
-    if not isinstance(api_key, str) or len(api_key) < 8:
+    # Cheap length check first, so obviously wrong values skip the regex
+    if not isinstance(api_key, str) or len(api_key) < _KEY_MIN_LENGTH:
         return False
     
-    return True
+    return _KEY_RE.fullmatch(api_key) is not None
 
 
-def load_config() -> Dict[str, Any]:
+def _build_config(file_config: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Load configuration from file
+    Merge defaults, environment variables and the config file contents
     
+    Args:
+        file_config: Configuration read from the config file
+        
     Returns:
         Configuration dictionary
     """
     config = DEFAULT_CONFIG.copy()
     
     # First try to load from .env file
-    load_dotenv()
+    _load_dotenv_once()
     
     # Check for environment variables
     api_key = os.environ.get("OPENROUTER_API_KEY")
@@ -117,36 +248,83 @@ def load_config() -> Dict[str, Any]:
     if verbosity:
         config["verbosity"] = verbosity
     
-    # Then try to load from config file (overrides env vars)
+    # Then apply the config file (overrides env vars)
+    config.update(file_config)
+    return config
+
+
+def _file_stamp(path: Path) -> tuple:
+    """
+    Get a cheap fingerprint of a file's contents for cache invalidation
+    
+    A single stat call; nanosecond mtime plus size catches edits made within
+    the same second, which a float mtime can miss on some filesystems.
+    
+    Args:
+        path: File to fingerprint
+        
+    Returns:
+        (mtime_ns, size) tuple, or (0, 0) if the file does not exist
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_config() -> Dict[str, Any]:
+    """
+    Load configuration from file
+    
+    Returns:
+        Configuration dictionary
+    """
     config_file = get_config_file()
     
-    if config_file.exists():
+    # Reuse the last result while the config file is unchanged
+    mtime = _file_stamp(config_file)
+    if mtime == _cache["mtime"]:
+        return _cache["config"].copy()
+    
+    file_config = {}
+    if mtime != (0, 0):
         try:
-            with open(config_file, "r") as f:
-                file_config = json.load(f)
-                config.update(file_config)
+            file_config = loads_json(config_file.read_bytes())
         except Exception as e:
             print(f"Error loading configuration file: {e}")
     
-    return config
+    config = _build_config(file_config)
+    _cache["mtime"] = mtime
+    _cache["config"] = config
+    return config.copy()
 
 
 def save_config(config: Dict[str, Any]) -> None:
     """
     Save configuration to file
     
+    The in-memory cache is updated with the saved values, so the next
+    load_config() doesn't have to read the file back.
+    
     Args:
         config: Configuration dictionary to save
     """
     config_file = get_config_file()
     
     try:
-        with open(config_file, "w") as f:
-            json.dump(config, f, indent=2)
+        atomic_write_json(config_file, config)
     except Exception as e:
+        # Force the next load_config() to re-read whatever is on disk
+        _cache["mtime"] = None
         print(f"Error saving configuration: {e}")
+        return
+    
+    _cache["mtime"] = _file_stamp(config_file)
+    _cache["config"] = _build_config(dict(config))
 
 
+@functools.lru_cache(maxsize=1)
 def get_conversation_dir() -> Path:
     """
     Get the directory for storing conversation history
@@ -159,43 +337,257 @@ def get_conversation_dir() -> Path:
     return data_dir
 
 
+def _conversation_file(conversation_id: str, suffix: str = CONVERSATION_SUFFIX) -> Path:
+    """
+    Get the path of a conversation file
+    
+    Args:
+        conversation_id: Unique identifier for the conversation
+        suffix: File format suffix (defaults to the format used for writing)
+        
+    Returns:
+        Path to the conversation file
+    """
+    return get_conversation_dir() / f"{conversation_id}{suffix}"
+
+
+def _encode_messages(messages: list) -> bytes:
+    """
+    Encode messages as JSONL, zstd-compressed when zstandard is available
+    
+    Each call produces a self-contained zstd frame. Concatenated frames
+    decompress as one stream, which is what lets append_messages() add to
+    a compressed file without rewriting it.
+    
+    Args:
+        messages: List of message objects
+        
+    Returns:
+        Encoded bytes to write to the conversation file
+    """
+    data = b"".join(dumps_json(m, indent=False) + b"\n" for m in messages)
+    if zstandard is not None:
+        return _CCTX.compress(data)
+    return data
+
+
+def _decode_jsonl(data: bytes) -> list:
+    """
+    Decode JSONL messages, ignoring a torn final record
+    
+    A partially written last line is what an interrupted append leaves
+    behind, so it is skipped rather than failing the whole log.
+    
+    Args:
+        data: Uncompressed JSONL bytes
+        
+    Returns:
+        List of message objects
+        
+    Raises:
+        ValueError: If any record other than the last cannot be decoded
+    """
+    lines = [line for line in data.splitlines() if line]
+    messages = []
+    for i, line in enumerate(lines):
+        try:
+            messages.append(loads_json(line))
+        except ValueError:
+            if i == len(lines) - 1:
+                break
+            raise
+    return messages
+
+
+def _decompress_frames(data: bytes) -> tuple:
+    """
+    Decompress concatenated zstd frames one at a time
+    
+    Decoding frame by frame, rather than with read_across_frames, is what
+    reveals a last frame cut short by an interrupted append.
+    
+    Args:
+        data: Compressed conversation file contents
+        
+    Returns:
+        (decompressed bytes, whether every frame was complete) tuple
+    """
+    chunks = []
+    while data:
+        dobj = _DCTX.decompressobj()
+        try:
+            chunks.append(dobj.decompress(data))
+        except zstandard.ZstdError:
+            return b"".join(chunks), False
+        if not dobj.eof:
+            return b"".join(chunks), False
+        data = dobj.unused_data
+    return b"".join(chunks), True
+
+
+def _has_clean_tail(path: Path) -> bool:
+    """
+    Check whether a conversation file ends on a complete record
+    
+    Compressed files are decoded in full, which only happens for files this
+    process has not written itself.
+    
+    Args:
+        path: Path to a JSONL conversation file
+        
+    Returns:
+        True if new records can be appended to the file as is
+    """
+    size = path.stat().st_size
+    if _clean_sizes.get(path) == size:
+        return True
+    if size == 0:
+        return True
+    
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            return False
+        data, complete = _decompress_frames(path.read_bytes())
+        return complete and (not data or data.endswith(b"\n"))
+    
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _read_conversation_file(path: Path) -> list:
+    """
+    Read messages from a conversation file in any supported format
+    
+    Args:
+        path: Path to the conversation file
+        
+    Returns:
+        List of message objects
+    """
+    data = path.read_bytes()
+    
+    if path.name.endswith(".json"):
+        # Legacy format: a single JSON array
+        return loads_json(data)
+    
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("the zstandard package is required to read compressed conversations")
+        # A truncated last frame still yields its complete records
+        data, _ = _decompress_frames(data)
+    
+    return _decode_jsonl(data)
+
+
 def save_conversation(conversation_id: str, messages: list) -> None:
     """
-    Save a conversation to a file
+    Save a full conversation, replacing any existing file
+    
+    Messages are stored one JSON object per line so later turns can be
+    appended with append_messages() instead of rewriting the whole file.
     
     Args:
         conversation_id: Unique identifier for the conversation
         messages: List of message objects
     """
-    conv_dir = get_conversation_dir()
-    conv_file = conv_dir / f"{conversation_id}.json"
+    conv_file = _conversation_file(conversation_id)
     
     try:
-        with open(conv_file, "w") as f:
-            json.dump(messages, f, indent=2)
+        atomic_write_bytes(conv_file, _encode_messages(messages))
+        _clean_sizes[conv_file] = conv_file.stat().st_size
+        
+        # The new file supersedes copies in other formats, but only those that
+        # could be read; anything else may hold history that was never loaded
+        for suffix in _CONVERSATION_SUFFIXES:
+            if suffix != CONVERSATION_SUFFIX:
+                other_file = _conversation_file(conversation_id, suffix)
+                if other_file.exists():
+                    try:
+                        _read_conversation_file(other_file)
+                    except Exception:
+                        continue
+                    other_file.unlink()
     except Exception as e:
         print(f"Error saving conversation: {e}")
 
 
-def load_conversation(conversation_id: str) -> list:
+def append_messages(conversation_id: str, messages: list) -> None:
     """
-    Load a conversation from a file
+    Append new messages to a saved conversation
+    
+    Only the new messages are written, so the cost of a turn does not grow
+    with the length of the conversation.
+    
+    Args:
+        conversation_id: Unique identifier for the conversation
+        messages: Message objects to append
+    """
+    conv_file = _conversation_file(conversation_id)
+    
+    # Start a new file (migrating any other format) rather than appending to
+    # nothing, and rewrite a file whose last record was torn by an interrupted write
+    if not conv_file.exists() or not _has_clean_tail(conv_file):
+        try:
+            existing = read_conversation(conversation_id)
+        except Exception as e:
+            # Never replace a conversation that exists but could not be read
+            print(f"Error saving conversation: could not read the existing history ({e})")
+            return
+        save_conversation(conversation_id, existing + list(messages))
+        return
+    
+    try:
+        with open(conv_file, "ab") as f:
+            f.write(_encode_messages(messages))
+        _clean_sizes[conv_file] = conv_file.stat().st_size
+    except Exception as e:
+        print(f"Error saving conversation: {e}")
+
+
+def read_conversation(conversation_id: str) -> list:
+    """
+    Load a conversation, raising if an existing file cannot be read
     
     Args:
         conversation_id: Unique identifier for the conversation
         
     Returns:
-        List of message objects
+        List of message objects (empty if the conversation does not exist)
+        
+    Raises:
+        Exception: If a conversation file exists but cannot be read
     """
-    conv_dir = get_conversation_dir()
-    conv_file = conv_dir / f"{conversation_id}.json"
+    for suffix in _CONVERSATION_SUFFIXES:
+        conv_file = _conversation_file(conversation_id, suffix)
+        if conv_file.exists():
+            messages = _read_conversation_file(conv_file)
+            
+            if suffix == ".json":
+                # Rewrites in the current format and removes the legacy file
+                save_conversation(conversation_id, messages)
+            return messages
     
-    if not conv_file.exists():
-        return []
+    return []
+
+
+def load_conversation(conversation_id: str) -> list:
+    """
+    Load a conversation from a file
+    
+    Compressed, plain JSONL and legacy JSON array files are all supported.
+    A legacy JSON array is converted to the current format once, so later
+    turns can be appended to it.
     
+    Args:
+        conversation_id: Unique identifier for the conversation
+        
+    Returns:
+        List of message objects (empty if the conversation does not exist or
+        cannot be read; use read_conversation() to tell the two apart)
+    """
     try:
-        with open(conv_file, "r") as f:
-            return json.load(f)
+        return read_conversation(conversation_id)
     except Exception as e:
         print(f"Error loading conversation: {e}")
         return []
@@ -203,7 +595,7 @@ def load_conversation(conversation_id: str) -> list:
 
 def list_conversations() -> list:
     """
-    List all saved conversations
+    List all saved conversations, most recently modified first
     
     Returns:
         List of conversation IDs
@@ -213,4 +605,20 @@ def list_conversations() -> list:
     if not conv_dir.exists():
         return []
     
-    return [f.stem for f in conv_dir.glob("*.json")]
+    # scandir yields DirEntry objects from a single directory read, avoiding
+    # a Path object per file; the stat result is cached on the entry
+    mtimes = {}
+    with os.scandir(conv_dir) as entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            for suffix in _CONVERSATION_SUFFIXES:
+                if entry.name.endswith(suffix):
+                    st = entry.stat(follow_symlinks=False)
+                    # Skip empty files left behind by an interrupted write
+                    if st.st_size == 0:
+                        break
+                    name = entry.name[:-len(suffix)]
+                    mtimes[name] = max(mtimes.get(name, 0.0), st.st_mtime)
+                    break
+    return sorted(mtimes, key=mtimes.get, reverse=True)
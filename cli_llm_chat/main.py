@@ -5,66 +5,141 @@ A command-line interface for chatting with LLMs using the OpenRouter API.
 """
 
 import typer
-import json
+from collections import defaultdict
+from itertools import chain, islice
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
-from rich.prompt import Prompt
-from typing import Optional, List, Dict, Any
-import requests
+from typing import Dict, List, Any, Optional
 import os
-from cli_llm_chat.ui.formatter import format_message, format_user_message
-from cli_llm_chat.ui.terminal import TerminalUI
 
-from cli_llm_chat.api.openrouter import OpenRouterClient
+from cli_llm_chat.api.openrouter import get_client, extract_content, cached_model_ids
+from cli_llm_chat.api.cache import create_cache
 from cli_llm_chat.config.settings import (
+    dumps_json,
+    loads_json,
     get_config_dir,
     load_config,
     save_config,
     get_api_key,
     validate_api_key,
-    save_conversation,
-    load_conversation,
+    read_conversation,
     list_conversations
 )
-
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.styles import Style
-from prompt_toolkit.formatted_text import HTML
-from pathlib import Path
+from cli_llm_chat.persist import persisted_counts, persist_conversation, queue_save, flush_saves
+from cli_llm_chat.utils.helpers import trim_history
 
 # Create Typer app
 app = typer.Typer(
-    help="CLI LLM Chat - A command-line interface for chatting with LLMs via OpenRouter",
-    add_completion=False
+    help="CLI LLM Chat - A command-line interface for chatting with LLMs via OpenRouter"
 )
 
 @app.callback()
-def main():
+def callback():
     """CLI LLM Chat - A command-line interface for chatting with LLMs via OpenRouter"""
     pass
 
 # Initialize console
 console = Console()
 
-# Global state
-conversation_history = {}
+# System prompts for each verbosity level
+SYSTEM_MESSAGES = {
+    "short": "You are a helpful AI assistant. IMPORTANT: Always provide concise responses of 1-5 lines maximum. Keep explanations minimal and focused.",
+    "medium": "You are a helpful AI assistant. IMPORTANT: Provide balanced responses between 5-15 lines. Include key details and brief examples while maintaining clarity.",
+    "long": "You are a helpful AI assistant. IMPORTANT: Provide comprehensive responses with detailed explanations, relevant examples, and thorough context. Focus on depth and completeness."
+}
+
+HELP_TEXT = """
+Available commands:
+  /exit - Exit the chat session
+  /clear - Clear conversation history
+  /save <name> - Save the current conversation
+  /list - List all saved conversations
+  /load <name> - Load a saved conversation
+  /help - Show this help message"""
+
+# Per-request fields accepted from batch_chat input lines
+BATCH_REQUEST_KEYS = ("messages", "model", "temperature", "max_tokens")
+
+# Streaming output is re-rendered after this many tokens or at a boundary character
+RENDER_EVERY_TOKENS = 16
+RENDER_BOUNDARIES = (".", "!", "?", "\n")
+
+
+def mask_key(key: Optional[str]) -> str:
+    """
+    Mask an API key for display, keeping only its first and last four characters
+    
+    Args:
+        key: API key to mask (None or empty when no key is configured)
+        
+    Returns:
+        Masked key, "(not set)" if there is no key, or "***" if the key is
+        too short to reveal any of it
+    """
+    if not key:
+        return "(not set)"
+    if len(key) < 8:
+        return "***"
+    return f"{key[:4]}...{key[-4:]}"
+
+
+def format_price(price: Any) -> str:
+    """
+    Format a per-token price from the models API for display
+    
+    Args:
+        price: Price in dollars per token, as the string the API returns
+        
+    Returns:
+        Formatted price, or "Unknown" if the price is missing or invalid
+    """
+    try:
+        return f"${float(price):.7f}"
+    except (TypeError, ValueError):
+        return "Unknown"
+
+
+def complete_model(incomplete: str) -> List[str]:
+    """
+    Shell completion for model options, served from the models disk cache
+    
+    Args:
+        incomplete: Partially typed model id
+        
+    Returns:
+        Matching model ids
+    """
+    return [model_id for model_id in cached_model_ids() if model_id.startswith(incomplete)]
+
+
+def configure_cache(client, config: Dict[str, Any], no_cache: bool) -> None:
+    """
+    Attach the persistent response cache to a client, or turn caching off
+    
+    Args:
+        client: OpenRouterClient to configure
+        config: Loaded configuration
+        no_cache: Disable response caching for this command
+    """
+    if no_cache:
+        client.cache.enabled = False
+        client.semantic_cache = None
+    else:
+        client.cache = create_cache(config.get("cache_max_gb", 1.0))
+
 
 @app.command()
 def chat(
     message: Optional[str] = typer.Option(None, "--message", "-m", "-msg", help="Single message to send (non-interactive mode)"),
-    model: str = typer.Option(None, "--model", help="Model to use for chat"),
+    model: str = typer.Option(None, "--model", help="Model to use for chat", autocompletion=complete_model),
     temperature: float = typer.Option(0.7, "--temperature", "-t", "-temp", help="Temperature for response generation"),
     max_tokens: int = typer.Option(1000, "--max-tokens", help="Maximum tokens in response"),
     debug: bool = typer.Option(False, "--debug", help="Show debug information"),
     conversation: str = typer.Option(None, "--conversation", "-c", "-conv", help="Name of the conversation to continue or create"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always send requests to the API instead of using cached responses"),
 ):
     """
     Start a chat session with an LLM
     """
-    global conversation_history
-    
     # Load configuration
     config = load_config()
     
@@ -84,145 +159,199 @@ def chat(
         model = config.get("default_model", "google/gemini-2.0-flash-001")
     
     # Initialize API client
-    client = OpenRouterClient(api_key)
+    client = get_client(api_key)
+    if config.get("semantic_cache_enabled", False):
+        from cli_llm_chat.api.semantic_cache import SemanticCache
+        client.semantic_cache = SemanticCache()
+    configure_cache(client, config, no_cache)
+    client.set_defaults(model=model, temperature=temperature, max_tokens=max_tokens)
+    
+    # Only the most recent messages are sent, so request size stays bounded in long sessions
+    context_window = config.get("context_window", 20)
+    context_tokens = config.get("max_context_tokens", 0)
+    
+    def build_context(messages):
+        window = trim_history(messages, context_window, context_tokens, model)
+        if len(window) < len(messages):
+            return window, f"Context trimmed: sending {len(window)} of {len(messages)} messages"
+        return window, None
+    verbosity = config.get("verbosity", "medium")
     
     # Set conversation name
     if not conversation:
         conversation = "default"
     
-    # Initialize conversation history if not exists
-    if conversation not in conversation_history:
-        # Try to load from saved conversations
-        loaded_messages = load_conversation(conversation)
-        if loaded_messages:
-            conversation_history[conversation] = loaded_messages
-            console.print(f"Loaded conversation: {conversation}")
-        else:
-            # Set up new conversation with system message
-            verbosity = config.get("verbosity", "medium")
-            system_message = {
-                "short": "You are a helpful AI assistant. IMPORTANT: Always provide concise responses of 1-5 lines maximum. Keep explanations minimal and focused.",
-                "medium": "You are a helpful AI assistant. IMPORTANT: Provide balanced responses between 5-15 lines. Include key details and brief examples while maintaining clarity.",
-                "long": "You are a helpful AI assistant. IMPORTANT: Provide comprehensive responses with detailed explanations, relevant examples, and thorough context. Focus on depth and completeness."
-            }[verbosity]
-            
-            conversation_history[conversation] = [
-                {"role": "system", "content": system_message}
-            ]
+    # Try to load from saved conversations; one that exists but cannot be read
+    # is never replaced by a new history
+    try:
+        history = read_conversation(conversation)
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] Could not read conversation '{conversation}': {e}")
+        console.print("Use --conversation to continue under a different name.")
+        raise typer.Exit(1)
+    if history:
+        persisted_counts[conversation] = len(history)
+        console.print(f"Loaded conversation: {conversation}")
+    else:
+        # Set up new conversation with system message
+        system_message = SYSTEM_MESSAGES[verbosity]
+        
+        history = [
+            {"role": "system", "content": system_message}
+        ]
     
     # Handle single message mode
     if message:
+        # UI modules are imported only by the code paths that render with them
+        from rich.live import Live
+        from cli_llm_chat.ui.formatter import format_message
+        
         # Add user message to history
-        conversation_history[conversation].append({"role": "user", "content": message})
+        history.append({"role": "user", "content": message})
         
         try:
-            # Get response from API
-            with console.status("[bold green]Thinking...[/bold green]"):
-                response = client.chat_completion(
-                    model=model,
-                    messages=conversation_history[conversation],
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    debug=debug
-                )
+            window, trim_note = build_context(history)
+            if debug and trim_note:
+                print(trim_note)
             
-            assistant_message = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-            
-            # Display formatted response
+            # Stream the response from the API, re-rendering as tokens arrive
             console.print("\n")
-            verbosity = config.get("verbosity", "medium")
-            formatted_message = format_message(assistant_message, verbosity=verbosity)
-            console.print(formatted_message)
+            buf = []
+            pending = 0
+            with Live(format_message("", verbosity=verbosity), console=console, refresh_per_second=12) as live:
+                for token in client.chat_completion_stream(
+                    messages=window,
+                    debug=debug,
+                    cache_namespace=conversation
+                ):
+                    buf.append(token)
+                    pending += 1
+                    # Markdown is re-parsed in full on each render, so only render
+                    # at sentence/line boundaries or every few tokens
+                    if pending >= RENDER_EVERY_TOKENS or token.endswith(RENDER_BOUNDARIES):
+                        live.update(format_message("".join(buf), verbosity=verbosity))
+                        pending = 0
+                
+                assistant_message = "".join(buf)
+                if pending:
+                    live.update(format_message(assistant_message, verbosity=verbosity))
             
             # Add assistant message to history
-            conversation_history[conversation].append({"role": "assistant", "content": assistant_message})
+            history.append({"role": "assistant", "content": assistant_message})
             
             # Save conversation
             if conversation:
-                save_conversation(conversation, conversation_history[conversation])
+                persist_conversation(conversation, history)
             
         except Exception as e:
             console.print(f"\n[bold red]Error:[/bold red] {str(e)}")
+        finally:
+            flush_saves()
         
         return
     
     # Interactive mode
+    from cli_llm_chat.ui.terminal import TerminalUI
+    
     terminal = TerminalUI()
     
-    def handle_input(user_input, conversation_history=conversation_history, conversation=conversation):
-        
-        # Handle special commands
-        if user_input.lower() == "/clear":
-            conversation_history[conversation] = []
-            terminal.append_message("System", "Conversation history cleared.")
-            return
-        elif user_input.lower() == "/help":
-            help_text = """
-Available commands:
-  /exit - Exit the chat session
-  /clear - Clear conversation history
-  /save <name> - Save the current conversation
-  /list - List all saved conversations
-  /load <name> - Load a saved conversation
-  /help - Show this help message"""
-            terminal.append_message("System", help_text)
-            return
-        elif user_input.lower().startswith("/save "):
-            new_name = user_input[6:].strip()
-            if new_name:
-                save_conversation(new_name, conversation_history[conversation])
-                conversation = new_name
-                terminal.append_message("System", f"Conversation saved as: {new_name}")
-            else:
-                terminal.append_message("System", "Please provide a name for the conversation")
-            return
-        elif user_input.lower() == "/list":
-            conversations = list_conversations()
-            if conversations:
-                terminal.append_message("System", "Saved conversations:\n" + "\n".join(f"  {conv}" for conv in conversations))
-            else:
-                terminal.append_message("System", "No saved conversations found.")
-            return
-        elif user_input.lower().startswith("/load "):
-            conv_name = user_input[6:].strip()
-            if conv_name:
-                loaded_messages = load_conversation(conv_name)
-                if loaded_messages:
-                    conversation = conv_name
-                    conversation_history[conversation] = loaded_messages
-                    terminal.append_message("System", f"Loaded conversation: {conv_name} with {len(loaded_messages)} messages")
-                else:
-                    terminal.append_message("System", f"Conversation not found: {conv_name}")
+    def cmd_clear(arg):
+        nonlocal history
+        history = []
+        persisted_counts[conversation] = 0
+        terminal.post_message("System", "Conversation history cleared.")
+    
+    def cmd_help(arg):
+        terminal.post_message("System", HELP_TEXT)
+    
+    def cmd_save(arg):
+        nonlocal conversation
+        if arg:
+            queue_save(arg, history)
+            persisted_counts[arg] = len(history)
+            conversation = arg
+            terminal.post_message("System", f"Conversation saved as: {arg}")
+        else:
+            terminal.post_message("System", "Please provide a name for the conversation")
+    
+    def cmd_list(arg):
+        # Queued saves must reach the disk before conversations are read back
+        flush_saves()
+        conversations = list_conversations()
+        if conversations:
+            terminal.post_message("System", "Saved conversations:\n" + "\n".join(f"  {conv}" for conv in conversations))
+        else:
+            terminal.post_message("System", "No saved conversations found.")
+    
+    def cmd_load(arg):
+        nonlocal conversation, history
+        if arg:
+            flush_saves()
+            try:
+                loaded_messages = read_conversation(arg)
+            except Exception as e:
+                terminal.post_message("System", f"Could not read conversation {arg}: {e}")
+                return
+            if loaded_messages:
+                conversation = arg
+                history = loaded_messages
+                persisted_counts[conversation] = len(loaded_messages)
+                terminal.post_message("System", f"Loaded conversation: {arg} with {len(loaded_messages)} messages")
             else:
-                terminal.append_message("System", "Please provide a name of the conversation to load")
-            return
+                terminal.post_message("System", f"Conversation not found: {arg}")
+        else:
+            terminal.post_message("System", "Please provide a name of the conversation to load")
+    
+    # Special commands, dispatched by their first word
+    commands = {
+        "/clear": cmd_clear,
+        "/help": cmd_help,
+        "/save": cmd_save,
+        "/list": cmd_list,
+        "/load": cmd_load,
+    }
+    
+    def handle_input(user_input):
+        # Runs on the UI's worker thread, one input at a time, so turns stay in order
+        
+        # Handle special commands; plain messages skip the parsing entirely
+        if user_input.startswith("/"):
+            name, _, arg = user_input.partition(" ")
+            handler = commands.get(name.lower())
+            if handler is not None:
+                handler(arg.strip())
+                return
         
         # Add user message to history
-        conversation_history[conversation].append({"role": "user", "content": user_input})
+        history.append({"role": "user", "content": user_input})
         
         try:
-            # Get response from API
-            response = client.chat_completion(
-                model=model,
-                messages=conversation_history[conversation],
-                temperature=temperature,
-                max_tokens=max_tokens,
-                debug=debug
-            )
+            window, trim_note = build_context(history)
+            if debug and trim_note:
+                terminal.post_message("System", trim_note)
             
-            assistant_message = response.get("choices", [{}])[0].get("message", {}).get("content", "")
+            # Stream the response from the API into the output area
+            parts = []
+            terminal.call_from_thread(terminal.start_message, "Assistant")
+            for token in client.chat_completion_stream(
+                messages=window,
+                debug=debug,
+                cache_namespace=conversation,
+                stop=terminal.stopped
+            ):
+                parts.append(token)
+                terminal.stream_text(token)
+            terminal.stream_text("\n")
             
             # Add assistant message to history
-            conversation_history[conversation].append({"role": "assistant", "content": assistant_message})
-            
-            # Save conversation after each message
-            save_conversation(conversation, conversation_history[conversation])
+            history.append({"role": "assistant", "content": "".join(parts)})
             
-            # Display formatted response
-            terminal.append_message("Assistant", assistant_message)
+            # Save conversation after each message; after the UI has exited this
+            # keeps the partial reply, written by the flush at interpreter exit
+            persist_conversation(conversation, history)
             
         except Exception as e:
-            terminal.append_message("System", f"Error: {str(e)}")
+            terminal.post_message("System", f"Error: {str(e)}")
     
     try:
         terminal.run(on_input=handle_input)
@@ -230,6 +359,91 @@ Available commands:
         console.print("\n[yellow]Exiting chat...[/yellow]")
     except EOFError:
         console.print("\n[yellow]Exiting chat...[/yellow]")
+    finally:
+        flush_saves()
+
+@app.command()
+def batch_chat(
+    input_file: str = typer.Argument(..., help="JSONL file with one request per line"),
+    output_file: Optional[str] = typer.Option(None, "--output", "-o", help="Write results to this JSONL file instead of stdout"),
+    model: str = typer.Option(None, "--model", help="Model for requests that do not set one", autocompletion=complete_model),
+    temperature: float = typer.Option(0.7, "--temperature", "-t", "-temp", help="Temperature for response generation"),
+    max_tokens: int = typer.Option(1000, "--max-tokens", help="Maximum tokens in each response"),
+    debug: bool = typer.Option(False, "--debug", help="Show debug information"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always send requests to the API instead of using cached responses"),
+):
+    """
+    Send a batch of independent prompts concurrently
+    
+    Each input line is a JSON object with either a "message" string or a
+    "messages" list, and optionally "model", "temperature" and "max_tokens".
+    Results are written as JSONL in input order.
+    """
+    import asyncio
+    
+    # Load configuration
+    config = load_config()
+    
+    # Get API key
+    api_key = get_api_key(config)
+    if not api_key:
+        console.print("[bold red]Error:[/bold red] API key not found. Please set it using the config command or OPENROUTER_API_KEY environment variable.")
+        raise typer.Exit(1)
+    
+    # Read the batch, giving single messages the configured system prompt
+    system_message = SYSTEM_MESSAGES[config.get("verbosity", "medium")]
+    batch = []
+    line_number = 0
+    try:
+        with open(input_file, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                request = loads_json(line)
+                if not isinstance(request, dict):
+                    raise ValueError("expected a JSON object")
+                if "messages" not in request:
+                    request["messages"] = [
+                        {"role": "system", "content": system_message},
+                        {"role": "user", "content": request["message"]}
+                    ]
+                batch.append({k: request[k] for k in BATCH_REQUEST_KEYS if k in request})
+    except (OSError, ValueError, KeyError) as e:
+        console.print(f"[bold red]Error:[/bold red] Could not read batch file (line {line_number}): {str(e)}")
+        raise typer.Exit(1)
+    
+    # Initialize API client
+    client = get_client(api_key)
+    configure_cache(client, config, no_cache)
+    client.set_defaults(
+        model=model or config.get("default_model", "google/gemini-2.0-flash-001"),
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+    
+    async def run_batch():
+        try:
+            return await client.chat_completion_many(batch, debug=debug)
+        finally:
+            await client.aclose()
+    
+    with console.status(f"[bold green]Sending {len(batch)} requests...[/bold green]"):
+        results = asyncio.run(run_batch())
+    
+    lines = []
+    for index, result in enumerate(results):
+        if isinstance(result, BaseException):
+            lines.append(dumps_json({"index": index, "error": str(result)}, indent=False).decode("utf-8"))
+        else:
+            lines.append(dumps_json({"index": index, "content": extract_content(result)}, indent=False).decode("utf-8"))
+    
+    if output_file:
+        with open(output_file, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        console.print(f"Wrote {len(lines)} results to {output_file}")
+    else:
+        for line in lines:
+            typer.echo(line)
 
 @app.command()
 def config_set(
@@ -237,7 +451,7 @@ def config_set(
         None, "--api-key", help="OpenRouter API key (use 'keep' to keep current value)"
     ),
     default_model: str = typer.Option(
-        None, "--default-model", help="Default model to use"
+        None, "--default-model", help="Default model to use", autocompletion=complete_model
     ),
     verbosity: str = typer.Option(
         None, "--verbosity", "-v",
@@ -250,9 +464,37 @@ def config_set(
     # Load existing config
     config = load_config()
     
+    # Prompt for the API key and default model when no options are given
+    if api_key is None and default_model is None and verbosity is None:
+        from prompt_toolkit import prompt
+        from prompt_toolkit.completion import WordCompleter
+        
+        entered_key = prompt("OpenRouter API key (leave empty to keep current): ", is_password=True).strip()
+        if entered_key:
+            api_key = entered_key
+        
+        # One models request both verifies the key and supplies the model completions
+        available_models = []
+        check_key = entered_key or get_api_key(config)
+        if check_key and validate_api_key(check_key):
+            try:
+                with console.status("[bold green]Verifying API key...[/bold green]"):
+                    available_models = [m.get("id", "") for m in get_client(check_key).list_models(refresh=True)]
+                console.print(f"✅ API key is valid: {len(available_models)} models available")
+            except Exception as e:
+                console.print(f"❌ Could not verify API key: {str(e)}")
+        
+        entered_model = prompt(
+            "Default model: ",
+            default=config.get("default_model") or "",
+            completer=WordCompleter(available_models, sentence=True)
+        ).strip()
+        if entered_model:
+            default_model = entered_model
+    
     # Update API key if provided
     if api_key is not None:
-        if api_key.lower() == "keep" and "api_key" in config:
+        if api_key.lower() == "keep" and config.get("api_key"):
             console.print("Keeping existing API key")
         else:
             # Validate API key format
@@ -284,9 +526,8 @@ def config_set(
     console.print("\nCurrent configuration:")
     
     # Display API key (masked)
-    if "api_key" in config:
-        masked_key = config["api_key"][:4] + "..." + config["api_key"][-4:]
-        console.print(f"API key: {masked_key}")
+    if config.get("api_key"):
+        console.print(f"API key: {mask_key(config['api_key'])}")
     else:
         console.print("API key: [not set]")
     
@@ -298,13 +539,16 @@ def config_set(
 
 @app.command()
 def test_model(
-    model: str = typer.Option("google/gemini-2.0-flash-001", help="Model to test"),
+    model: str = typer.Option("google/gemini-2.0-flash-001", help="Model to test", autocompletion=complete_model),
     message: str = typer.Option("Hello! Can you tell me what model you are?", help="Test message to send"),
     debug: bool = typer.Option(False, "--debug", help="Show debug information"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always send requests to the API instead of using cached responses"),
 ):
     """
     Test a specific model with your API key
     """
+    from rich.markdown import Markdown
+    
     # Load configuration
     config = load_config()
     
@@ -315,7 +559,8 @@ def test_model(
         raise typer.Exit(1)
     
     # Initialize API client
-    client = OpenRouterClient(api_key)
+    client = get_client(api_key)
+    configure_cache(client, config, no_cache)
     
     # Send test message
     console.print(f"Testing model: {model}")
@@ -332,19 +577,44 @@ def test_model(
             )
         
         # Display response
-        assistant_message = response.get("choices", [{}])[0].get("message", {}).get("content", "")
+        assistant_message = extract_content(response)
         console.print(Markdown(assistant_message))
         
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
 
+@app.command()
+def cache_clear():
+    """
+    Remove all cached API responses
+    """
+    config = load_config()
+    create_cache(config.get("cache_max_gb", 1.0)).clear()
+    
+    semantic_cache_file = get_config_dir() / "semantic_cache.npz"
+    if semantic_cache_file.exists():
+        semantic_cache_file.unlink()
+    
+    console.print("Response cache cleared")
+
 @app.command()
 def debug():
     """
     Run diagnostics to check API connectivity and configuration
     """
+    import asyncio
+    
     console.print("[bold]Running diagnostics...[/bold]")
+    asyncio.run(_run_diagnostics())
+
+
+def _check_local_config(env_api_key: Optional[str]) -> None:
+    """
+    Print diagnostics for the config directory, config file and environment
     
+    Args:
+        env_api_key: Value of OPENROUTER_API_KEY before any .env file was loaded
+    """
     # Check config directory
     config_dir = get_config_dir()
     console.print(f"Config directory: {config_dir}")
@@ -361,14 +631,13 @@ def debug():
         
         # Check if config file is valid JSON
         try:
-            with open(config_file, "r") as f:
-                config = json.load(f)
+            with open(config_file, "rb") as f:
+                config = loads_json(f.read())
             console.print("✅ Config file is valid JSON")
             
             # Check if API key is set
-            if "api_key" in config:
-                masked_key = config["api_key"][:4] + "..." + config["api_key"][-4:]
-                console.print(f"✅ API key is set: {masked_key}")
+            if config.get("api_key"):
+                console.print(f"✅ API key is set: {mask_key(config['api_key'])}")
                 
                 # Validate API key format
                 if validate_api_key(config["api_key"]):
@@ -390,16 +659,14 @@ def debug():
             else:
                 console.print("ℹ️ Verbosity is not set (will use default)")
                 
-        except json.JSONDecodeError:
+        except ValueError:
             console.print("❌ Config file is not valid JSON")
     else:
         console.print("❌ Config file does not exist")
     
     # Check environment variable
-    env_api_key = os.environ.get("OPENROUTER_API_KEY")
     if env_api_key:
-        masked_key = env_api_key[:4] + "..." + env_api_key[-4:]
-        console.print(f"✅ OPENROUTER_API_KEY environment variable is set: {masked_key}")
+        console.print(f"✅ OPENROUTER_API_KEY environment variable is set: {mask_key(env_api_key)}")
         
         # Validate API key format
         if validate_api_key(env_api_key):
@@ -408,17 +675,41 @@ def debug():
             console.print("❌ Environment API key format is invalid")
     else:
         console.print("ℹ️ OPENROUTER_API_KEY environment variable is not set")
+
+
+async def _run_diagnostics() -> None:
+    """Run the local checks concurrently with the API connectivity probe"""
+    import asyncio
     
-    # Test API connectivity
+    env_api_key = os.environ.get("OPENROUTER_API_KEY")
     api_key = get_api_key(load_config())
+    
+    # Start the API request first so it is in flight while the local checks run
+    client = None
+    probe = None
+    probe_error = None
     if api_key:
         try:
-            client = OpenRouterClient(api_key)
+            client = get_client(api_key)
+            probe = asyncio.create_task(client.list_models_async(refresh=True))
+        except Exception as e:
+            probe_error = e
+    
+    await asyncio.to_thread(_check_local_config, env_api_key)
+    
+    # Test API connectivity
+    if api_key:
+        try:
+            if probe_error is not None:
+                raise probe_error
             with console.status("[bold green]Testing API connectivity...[/bold green]"):
-                models = client.list_models()
+                models = await probe
             console.print(f"✅ API connectivity test successful: {len(models)} models available")
         except Exception as e:
             console.print(f"❌ API connectivity test failed: {str(e)}")
+        finally:
+            if client is not None:
+                await client.aclose()
     else:
         console.print("❌ Cannot test API connectivity: No API key available")
 
@@ -427,6 +718,8 @@ def models(limit: int = typer.Option(20, help="Maximum number of models to displ
     """
     List available models from OpenRouter API
     """
+    from rich.table import Table
+    
     # Load configuration
     config = load_config()
     
@@ -437,39 +730,56 @@ def models(limit: int = typer.Option(20, help="Maximum number of models to displ
         raise typer.Exit(1)
     
     # Initialize API client
-    client = OpenRouterClient(api_key)
+    client = get_client(api_key)
     
     # Get models
     try:
         with console.status("[bold green]Fetching models...[/bold green]"):
             models_list = client.list_models()
         
-        # Sort models by id
+        # Sort models by id and group them by provider prefix
         models_list.sort(key=lambda x: x.get("id", ""))
+        providers = defaultdict(list)
+        for model in models_list:
+            model_id = model.get("id", "")
+            provider = model_id.split("/", 1)[0].upper() if "/" in model_id else "OTHER"
+            providers[provider].append((provider, model_id, model))
         
-        # Limit number of models
-        models_list = models_list[:limit]
+        # Display models, formatting only the first `limit` entries
+        shown = list(islice(chain.from_iterable(providers.values()), limit))
+        table = Table(title=f"Available models ({len(shown)})", title_justify="left")
+        table.add_column("Provider", style="bold")
+        table.add_column("Model", style="bold")
+        table.add_column("Context", justify="right")
+        table.add_column("Input $/tok", justify="right")
+        table.add_column("Output $/tok", justify="right")
         
-        # Display models
-        console.print(f"[bold]Available models ({len(models_list)}):[/bold]")
-        for model in models_list:
-            model_id = model.get("id", "Unknown")
-            context_length = model.get("context_length", "Unknown")
-            pricing = model.get("pricing", {})
-            input_price = pricing.get("input", 0)
-            output_price = pricing.get("output", 0)
-            
-            # Format pricing per million tokens
-            input_price_formatted = f"${input_price:.5f}" if input_price else "Unknown"
-            output_price_formatted = f"${output_price:.5f}" if output_price else "Unknown"
+        current_provider = None
+        for provider, model_id, model in shown:
+            pricing = model.get("pricing") or {}
+            input_price = format_price(pricing.get("prompt"))
+            output_price = format_price(pricing.get("completion"))
             
-            console.print(f"[bold]{model_id}[/bold]")
-            console.print(f"  Context length: {context_length} tokens")
-            console.print(f"  Pricing (per token): Input {input_price_formatted} / Output {output_price_formatted}")
-            console.print("")
+            if provider != current_provider and current_provider is not None:
+                table.add_section()
+            table.add_row(
+                provider if provider != current_provider else "",
+                model_id or "Unknown",
+                str(model.get("context_length", "Unknown")),
+                input_price,
+                output_price
+            )
+            current_provider = provider
+        
+        # One render for the whole listing
+        console.print(table)
         
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
 
-if __name__ == "__main__":
+def main():
+    """Console script entry point"""
     app()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Background conversation persistence for CLI LLM Chat
+Conversation writes are queued and performed by a daemon thread, so disk
+I/O stays off the interactive critical path.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from typing import Dict, List, Any
+
+from cli_llm_chat.config.settings import save_conversation, append_messages
+
+# Writes queued within this many seconds of each other are merged
+DEBOUNCE_SECONDS = 0.5
+
+# Number of messages of each conversation already handed to the writer
+persisted_counts = {}
+
+_queue = queue.Queue()
+_thread = None
+_thread_lock = threading.Lock()
+
+# Queued by flush_saves() to end the debounce window early
+_FLUSH = object()
+
+
+def _merge(batch: list) -> Dict[str, list]:
+    """
+    Collapse queued writes into at most one write per conversation
+
+    A full rewrite supersedes everything queued before it; appends queued
+    after a rewrite are folded into it.
+
+    Args:
+        batch: Queued (mode, name, messages) tuples in order
+
+    Returns:
+        Mapping of conversation name to [mode, messages], in first-queued order
+    """
+    pending = {}
+    for item in batch:
+        if item is _FLUSH:
+            continue
+        mode, name, messages = item
+        if mode == "full" or name not in pending:
+            pending[name] = [mode, list(messages)]
+        else:
+            pending[name][1].extend(messages)
+    return pending
+
+
+def _writer() -> None:
+    """Collect queued writes for the debounce window and perform them"""
+    while True:
+        batch = [_queue.get()]
+
+        # Gather writes that arrive shortly after, unless a flush is waiting
+        deadline = time.monotonic() + DEBOUNCE_SECONDS
+        while batch[-1] is not _FLUSH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        try:
+            for name, (mode, messages) in _merge(batch).items():
+                try:
+                    if mode == "full":
+                        save_conversation(name, messages)
+                    else:
+                        append_messages(name, messages)
+                except Exception as e:
+                    print(f"Error saving conversation: {e}")
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def _enqueue(item) -> None:
+    """Queue an item for the writer thread, starting it on first use"""
+    global _thread
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_writer, name="conversation-saver", daemon=True)
+            _thread.start()
+    _queue.put_nowait(item)
+
+
+def queue_save(name: str, messages: List[Dict[str, Any]]) -> None:
+    """
+    Queue a full rewrite of a saved conversation
+
+    Args:
+        name: Name of the conversation
+        messages: Complete message history (copied before queueing)
+    """
+    _enqueue(("full", name, list(messages)))
+
+
+def queue_append(name: str, messages: List[Dict[str, Any]]) -> None:
+    """
+    Queue new messages to be appended to a saved conversation
+
+    Args:
+        name: Name of the conversation
+        messages: Messages to append (copied before queueing)
+    """
+    _enqueue(("append", name, list(messages)))
+
+
+def persist_conversation(name: str, messages: List[Dict[str, Any]]) -> None:
+    """
+    Queue a conversation's unsaved messages to be written to disk
+
+    New messages are appended to the saved log; the file is only rewritten
+    in full when nothing has been saved yet or the history was replaced.
+
+    Args:
+        name: Name of the conversation to save
+        messages: Current message history of the conversation
+    """
+    saved = persisted_counts.get(name, 0)
+
+    if saved == 0 or saved > len(messages):
+        queue_save(name, messages)
+    elif saved < len(messages):
+        queue_append(name, messages[saved:])
+
+    persisted_counts[name] = len(messages)
+
+
+def flush_saves() -> None:
+    """Block until all queued conversation writes have finished"""
+    if _thread is None:
+        return
+    _queue.put_nowait(_FLUSH)
+    _queue.join()
+
+
+# Queued writes are not lost when the process exits normally
+atexit.register(flush_saves)
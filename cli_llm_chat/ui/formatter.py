@@ -4,11 +4,17 @@ Message formatting utilities for the CLI LLM Chat UI
 
 import re
 from rich.markdown import Markdown
-from rich.text import Text
-from rich.console import Console
 from rich.panel import Panel
 from rich.style import Style
-from rich.syntax import Syntax
+
+__all__ = ["format_message", "format_user_message", "format_code_blocks", "truncate_message"]
+
+# Fenced code block with an optional language tag
+_CODE_RE = re.compile(r"```(\w+)?\n(.*?)```", re.DOTALL)
+
+# Panel styles, built once instead of per message
+_ASSISTANT_STYLE = Style(color="green", bold=False)
+_USER_STYLE = Style(color="yellow")
 
 
 def format_message(message: str, verbosity: str = "brief") -> Panel:
@@ -22,8 +28,6 @@ def format_message(message: str, verbosity: str = "brief") -> Panel:
     Returns:
         Formatted message as a Rich Panel object
     """
-    style = Style(color="green", bold=False)
-    
     # Process code blocks first
     message = format_code_blocks(message)
     
@@ -35,23 +39,18 @@ def format_message(message: str, verbosity: str = "brief") -> Panel:
         border_style="blue",
         title=f"Assistant ({verbosity.title()})",
         title_align="left",
-        style=style,
+        style=_ASSISTANT_STYLE,
         padding=(1, 2)
     )
 
 def format_user_message(message: str, include_prompt: bool = False) -> str:
     """Format user message with a distinct style"""
-    # Create a temporary console for rendering
-    temp_console = Console(record=True)
-    temp_console.print(message)
-    content = temp_console.export_text()
-    
     panel = Panel(
-        content.strip(),
+        message.strip(),
         border_style="yellow",
         title="User",
         title_align="left",
-        style="yellow",
+        style=_USER_STYLE,
         padding=(1, 2)
     )
     
@@ -68,16 +67,19 @@ def format_code_blocks(message: str) -> str:
     Returns:
         Message with enhanced code block formatting
     """
-    # Replace triple backtick code blocks with Rich syntax highlighting
-    pattern = r"```(\w+)?\n(.*?)```"
+    # Most messages have no code at all, so skip the regex pass for them
+    if "```" not in message:
+        return message
     
+    # Normalize fences and leave highlighting to Markdown(code_theme=...), so
+    # each block goes through Pygments once
     def replace_code_block(match):
         language = match.group(1) or "text"
         code = match.group(2).strip()
         # Keep the markdown format but ensure proper spacing
         return f"\n```{language}\n{code}\n```\n"
     
-    return re.sub(pattern, replace_code_block, message, flags=re.DOTALL)
+    return _CODE_RE.sub(replace_code_block, message)
 
 
 def truncate_message(message: str, max_length: int = 1000) -> str:
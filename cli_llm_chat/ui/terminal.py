@@ -1,18 +1,47 @@
 """Terminal UI for CLI LLM Chat"""
 
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from prompt_toolkit import Application
-from prompt_toolkit.layout.containers import HSplit, Window, ScrollOffsets
+from prompt_toolkit.document import Document
+from prompt_toolkit.filters import Condition
+from prompt_toolkit.layout.containers import HSplit, Window, ScrollOffsets, ConditionalContainer
 from prompt_toolkit.layout.controls import FormattedTextControl
 from prompt_toolkit.layout.layout import Layout
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.widgets import TextArea
 from prompt_toolkit.styles import Style
 
+WELCOME_TEXT = "Welcome to CLI LLM Chat!\nType your messages below. Type /exit to end the session.\n"
+
+# Number of messages kept in the output area; older ones stay in the conversation history only
+MAX_DISPLAYED_MESSAGES = 1000
+
+# Streamed text is collected for this many seconds before the output area is updated
+STREAM_FLUSH_INTERVAL = 0.05
+
 class TerminalUI:
     def __init__(self):
         self.kb = KeyBindings()
+        self._entries = deque([WELCOME_TEXT], maxlen=MAX_DISPLAYED_MESSAGES)
+        
+        # Inputs are handled off the UI thread by a single worker, so the UI
+        # stays responsive and typed-ahead messages are answered in order
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-worker")
+        self._pending_jobs = 0
+        
+        # Set when the UI exits, so a response still streaming can stop early
+        self.stopped = threading.Event()
+        
+        # UI updates posted by the worker, applied in order on the UI thread
+        self._ui_ops = deque()
+        self._ui_ops_lock = threading.Lock()
+        self._drain_scheduled = False
+        
         self.output_area = TextArea(
-            text="Welcome to CLI LLM Chat!\nType your messages below. Type /exit to end the session.\n",
+            text=WELCOME_TEXT,
             read_only=True,
             scrollbar=True,
             wrap_lines=True
@@ -24,9 +53,15 @@ class TerminalUI:
             style='class:input'
         )
         
+        self.status_bar = ConditionalContainer(
+            Window(FormattedTextControl(self._status_text), height=1, style='class:status'),
+            filter=Condition(lambda: self._pending_jobs > 0)
+        )
+        
         # Create the layout
         self.root_container = HSplit([
             self.output_area,
+            self.status_bar,
             self.input_area,
         ])
         
@@ -40,6 +75,7 @@ class TerminalUI:
             key_bindings=self.kb,
             style=Style.from_dict({
                 'input': 'ansiyellow',
+                'status': 'ansicyan italic',
             })
         )
         
@@ -53,12 +89,10 @@ class TerminalUI:
                 event.app.exit()
                 return
                 
-            # Add user input to output area
-            self.append_message("You", user_input)
-            
-            # Let the caller handle the input
-            if self.on_input:
-                self.on_input(user_input)
+            # Let the caller handle the input on the worker thread
+            self._pending_jobs += 1
+            future = self._pool.submit(self._handle_input, user_input)
+            future.add_done_callback(lambda f: self.call_from_thread(self._job_done, f))
         
         # Handle Ctrl+C and Ctrl+D
         @self.kb.add('c-c')
@@ -68,15 +102,121 @@ class TerminalUI:
     
     def append_message(self, sender, message):
         """Add a message to the output area"""
+        self._append_entry(f"{self._header(sender)}{message}\n")
+    
+    def start_message(self, sender):
+        """Start a message whose text arrives later through append_text()"""
+        self._append_entry(self._header(sender))
+    
+    def append_text(self, text):
+        """Append streamed text to the last message in the output area"""
+        self._entries[-1] += text
+        self._set_text(self.output_area.buffer.text + text)
+    
+    def post_message(self, sender, message):
+        """Add a message to the output area from a worker thread"""
+        self.call_from_thread(self.append_message, sender, message)
+    
+    def _handle_input(self, user_input):
+        # Echo the input only once its turn comes, so it never lands in the
+        # middle of a response that is still streaming
+        self.post_message("You", user_input)
+        if self.on_input:
+            self.on_input(user_input)
+    
+    def _job_done(self, future):
+        self._pending_jobs -= 1
+        if not future.cancelled() and future.exception() is not None:
+            self.append_message("System", f"Error: {future.exception()}")
+        self.app.invalidate()
+    
+    def _status_text(self):
+        queued = self._pending_jobs - 1
+        if queued > 0:
+            return f" Waiting for response... ({queued} queued)"
+        return " Waiting for response..."
+    
+    def _header(self, sender):
         if sender == "You":
-            self.output_area.text += f"\n[You]:\n{message}\n"
+            return "\n[You]:\n"
+        return "\n[Assistant]:\n"
+    
+    def _append_entry(self, entry):
+        if len(self._entries) == self._entries.maxlen:
+            # The oldest message is dropped, so rebuild the bounded tail
+            self._entries.append(entry)
+            self._set_text("".join(self._entries))
         else:
-            self.output_area.text += f"\n[Assistant]:\n{message}\n"
+            self._entries.append(entry)
+            self._set_text(self.output_area.buffer.text + entry)
+    
+    def _set_text(self, text):
+        # Replace the document once, with the cursor at the end to scroll to bottom
+        self.output_area.buffer.set_document(Document(text, cursor_position=len(text)), bypass_readonly=True)
+    
+    def call_from_thread(self, func, *args):
+        """
+        Run a UI update from a worker thread on the UI event loop
         
-        # Scroll to bottom
-        self.output_area.buffer.cursor_position = len(self.output_area.text)
+        prompt_toolkit is not thread-safe, so worker threads must not touch
+        the buffers directly. Updates after the UI has exited are dropped.
+        """
+        self._post(func, args)
+    
+    def stream_text(self, text):
+        """
+        Append streamed text to the last message from a worker thread
+        
+        Text is coalesced and rendered at most once per STREAM_FLUSH_INTERVAL
+        instead of once per token.
+        """
+        self._post(None, text)
+    
+    def _post(self, func, args):
+        loop = self.app.loop
+        if loop is None or not self.app.is_running:
+            return
+        
+        with self._ui_ops_lock:
+            self._ui_ops.append((func, args))
+            if func is not None:
+                # Other updates are applied right away, after any text queued before them
+                loop.call_soon_threadsafe(self._drain_ui_ops)
+            elif not self._drain_scheduled:
+                self._drain_scheduled = True
+                loop.call_soon_threadsafe(loop.call_later, STREAM_FLUSH_INTERVAL, self._drain_ui_ops)
+    
+    def _drain_ui_ops(self):
+        with self._ui_ops_lock:
+            ops = list(self._ui_ops)
+            self._ui_ops.clear()
+            self._drain_scheduled = False
+        
+        # Apply updates in posting order, joining runs of streamed text
+        chunks = []
+        for func, args in ops:
+            if func is None:
+                chunks.append(args)
+                continue
+            if chunks:
+                self.append_text("".join(chunks))
+                chunks = []
+            func(*args)
+        if chunks:
+            self.append_text("".join(chunks))
     
     def run(self, on_input=None):
-        """Run the terminal UI"""
+        """
+        Run the terminal UI
+        
+        Args:
+            on_input: Called with each submitted line on the worker thread;
+                      it must update the UI through post_message() or
+                      call_from_thread()
+        """
         self.on_input = on_input
-        self.app.run()
+        try:
+            self.app.run()
+        finally:
+            self.stopped.set()
+            self._pool.shutdown(wait=False, cancel_futures=True)
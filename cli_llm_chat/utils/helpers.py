@@ -2,7 +2,8 @@
 Helper utilities for CLI LLM Chat
 """
 
-import uuid
+import functools
+import secrets
 import datetime
 from typing import Dict, List, Any
 
@@ -15,7 +16,7 @@ def generate_conversation_id() -> str:
         Unique conversation ID
     """
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
+    unique_id = secrets.token_hex(4)
     return f"{timestamp}_{unique_id}"
 
 
@@ -33,15 +34,97 @@ def format_timestamp(timestamp: float) -> str:
     return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def count_tokens(text: str) -> int:
+def trim_history(
+    messages: List[Dict[str, Any]],
+    max_messages: int,
+    max_tokens: int = 0,
+    model: str = "gpt-4o"
+) -> List[Dict[str, Any]]:
     """
-    Estimate the number of tokens in a text string
-    This is a very rough approximation (about 4 chars per token)
+    Limit a conversation to the most recent messages sent to the API
+    
+    A leading system message is always kept so the verbosity instructions
+    survive trimming, and so is the latest message. The stored conversation
+    is not modified.
+    
+    Args:
+        messages: Full conversation history
+        max_messages: Number of most recent non-system messages to keep (0 or less keeps all)
+        max_tokens: Token budget for the kept non-system messages (0 or less disables it)
+        model: Model identifier used for token counting
+        
+    Returns:
+        Messages to send with the request
+    """
+    if messages and messages[0].get("role") == "system":
+        system, rest = messages[:1], messages[1:]
+    else:
+        system, rest = [], messages
+    
+    if max_messages > 0 and len(rest) > max_messages:
+        rest = rest[-max_messages:]
+    
+    if max_tokens > 0:
+        # Walk back from the newest message until the budget is used up
+        budget = max_tokens
+        start = len(rest)
+        while start > 0:
+            cost = count_tokens(str(rest[start - 1].get("content", "")), model)
+            if cost > budget and start < len(rest):
+                break
+            budget -= cost
+            start -= 1
+        rest = rest[start:]
+    
+    if len(system) + len(rest) == len(messages):
+        return messages
+    return system + rest
+
+
+@functools.lru_cache(maxsize=32)
+def _enc(model: str):
+    """
+    Get the tiktoken encoding for a model, cached per process
+    
+    Args:
+        model: Model identifier, with or without an OpenRouter provider prefix
+        
+    Returns:
+        tiktoken Encoding, or None if tiktoken is not installed or the
+        encoding cannot be loaded
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    
+    # The first use of an encoding downloads its BPE file, which fails when
+    # offline or behind a proxy; the approximation is used instead
+    try:
+        try:
+            return tiktoken.encoding_for_model(model.rsplit("/", 1)[-1])
+        except KeyError:
+            # Models tiktoken does not know (most non-OpenAI models) use a close approximation
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """
+    Count the number of tokens in a text string
+    
+    Uses the model's tiktoken encoding when tiktoken is installed, and a
+    rough approximation (about 4 chars per token) otherwise.
     
     Args:
         text: Text to count tokens for
+        model: Model identifier used to pick the encoding
         
     Returns:
-        Estimated token count
+        Token count
     """
-    return len(text) // 4
+    enc = _enc(model)
+    if enc is None:
+        return len(text) // 4
+    return len(enc.encode(text, disallowed_special=()))
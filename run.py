@@ -3,7 +3,7 @@
 Entry point script for CLI LLM Chat
 """
 
-from cli_llm_chat.main import app
+from cli_llm_chat.main import main
 
 if __name__ == "__main__":
-    app()
+    main()
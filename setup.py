@@ -9,11 +9,24 @@ setup(
         "typer>=0.9.0",
         "rich>=13.5.0",
         "requests>=2.31.0",
+        "httpx[http2]>=0.27.0",
         "python-dotenv>=1.0.0",
+        "orjson>=3.9.0",
+        "zstandard>=0.22.0",
+        "tiktoken>=0.7.0",
     ],
+    extras_require={
+        "semantic": [
+            "numpy>=1.24.0",
+            "sentence-transformers>=2.2.0",
+        ],
+        "cache": [
+            "diskcache>=5.6.0",
+        ],
+    },
     entry_points={
         'console_scripts': [
-            'llmchat=cli_llm_chat.main:app.run',
+            'llmchat=cli_llm_chat.main:main',
         ],
     },
     python_requires=">=3.9",